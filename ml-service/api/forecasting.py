@@ -0,0 +1,42 @@
+import pandas as pd
+
+# Runs inside the forecast process pool. Keep imports light: workers load
+# this module instead of api.main, and Prophet is only imported in them.
+
+# Prophet output columns used when building forecast responses
+FORECAST_COLUMNS = ['ds', 'yhat', 'yhat_lower', 'yhat_upper', 'trend', 'weekly']
+
+
+def init_worker():
+    """Load Prophet's Stan backend once per worker process."""
+    from prophet import Prophet
+    Prophet()
+
+
+def ready() -> bool:
+    """No-op task used to make the pool start its workers."""
+    return True
+
+def fit_and_predict(history: pd.DataFrame, forecast_days: int) -> pd.DataFrame:
+    """Fit Prophet on ds/y history and return the forecast for future dates only."""
+    from prophet import Prophet
+
+    model = Prophet(
+        yearly_seasonality=True,
+        weekly_seasonality=True,
+        daily_seasonality=False,
+        changepoint_prior_scale=0.05,
+        mcmc_samples=0,
+        uncertainty_samples=200
+    )
+
+    # Add holiday effects if available
+    model.fit(history)
+
+    # Generate future dates
+    future = model.make_future_dataframe(periods=forecast_days)
+    forecast = model.predict(future)
+
+    # Keep only the future rows and the columns the response reads
+    columns = [c for c in FORECAST_COLUMNS if c in forecast.columns]
+    return forecast[columns].tail(forecast_days).reset_index(drop=True)
@@ -1,30 +1,34 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from operator import attrgetter
+from cachetools import LRUCache, TTLCache
+from numba import njit
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingClassifier
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from prophet import Prophet
+import orjson
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from api import forecasting
 import joblib
 import os
-
-app = FastAPI(
-    title="FlavorMetrics ML Service",
-    description="Machine Learning API for Restaurant Analytics",
-    version="1.0.0"
-)
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+import asyncio
+import re
+import hashlib
+import threading
+import multiprocessing
+import math
+import heapq
+
+try:
+    import hyperscan
+except ImportError:  # Only installed on x86_64; elsewhere aspects use ASPECT_PATTERNS
+    hyperscan = None
 
 # Initialize sentiment analyzer
 sentiment_analyzer = SentimentIntensityAnalyzer()
@@ -33,6 +37,87 @@ sentiment_analyzer = SentimentIntensityAnalyzer()
 models = {}
 scalers = {}
 
+# Fitted forecasts keyed by (restaurant_id, history hash, forecast_days)
+_forecast_cache = LRUCache(maxsize=128)
+_forecast_cache_lock = threading.Lock()
+
+# Menu optimization results keyed by a hash of the submitted menu items
+_menu_cache = TTLCache(maxsize=256, ttl=300)
+_menu_cache_lock = threading.Lock()
+
+# Common aspect keywords for review analysis
+ASPECT_KEYWORDS = {
+    "food": ["food", "dish", "meal", "taste", "flavor", "menu", "portion"],
+    "service": ["service", "server", "waiter", "waitress", "staff", "attentive"],
+    "ambiance": ["ambiance", "atmosphere", "decor", "music", "noise", "lighting"],
+    "value": ["price", "value", "worth", "expensive", "cheap", "affordable"],
+    "wait_time": ["wait", "time", "slow", "fast", "quick", "delayed"]
+}
+
+# One precompiled pattern per aspect; plain substring match like the keyword list
+ASPECT_PATTERNS = {
+    aspect: re.compile("|".join(re.escape(kw) for kw in keywords))
+    for aspect, keywords in ASPECT_KEYWORDS.items()
+}
+
+ASPECT_NAMES = list(ASPECT_KEYWORDS)
+
+
+def _compile_aspect_database():
+    """Build one Hyperscan database of all aspect keywords, tagged by aspect index."""
+    expressions, ids = [], []
+    for aspect_id, keywords in enumerate(ASPECT_KEYWORDS.values()):
+        for kw in keywords:
+            expressions.append(re.escape(kw).encode())
+            ids.append(aspect_id)
+    database = hyperscan.Database()
+    database.compile(
+        expressions=expressions,
+        ids=ids,
+        elements=len(expressions),
+        flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(expressions)
+    )
+    return database
+
+
+aspect_database = _compile_aspect_database() if hyperscan is not None else None
+
+# Hyperscan scratch space can't be shared between concurrent scans
+_hyperscan_local = threading.local()
+
+# Relative demand by hour (11am - 11pm)
+HOURLY_DISTRIBUTION = {
+    11: 0.3, 12: 0.8, 13: 1.0, 14: 0.6,  # Lunch
+    15: 0.3, 16: 0.4, 17: 0.7, 18: 1.2,  # Transition
+    19: 1.4, 20: 1.3, 21: 1.0, 22: 0.5   # Dinner
+}
+
+# Staff ratios (covers per staff member)
+STAFF_RATIOS = {
+    "SERVER": 15,      # 15 covers per server
+    "KITCHEN": 25,     # 25 covers per kitchen staff
+    "BARTENDER": 30,   # 30 covers per bartender
+    "HOST": 60,        # 1 host per 60 covers
+    "BUSSER": 30       # 30 covers per busser
+}
+
+_HOURLY_SUM = sum(HOURLY_DISTRIBUTION.values())
+_HOURLY_FACTORS = np.array(list(HOURLY_DISTRIBUTION.values()), dtype=np.float64)
+_STAFF_RATIOS = np.array(list(STAFF_RATIOS.values()), dtype=np.float64)
+
+# Recommended action for each menu engineering class
+MENU_ACTIONS = {
+    "Star": "Maintain position, consider slight price increase",
+    "Plowhorse": "Reduce portion size or increase price to improve margin",
+    "Puzzle": "Increase visibility, train staff to suggest",
+    "Dog": "Consider removing or complete redesign"
+}
+
+# Churn risk buckets: probability < 0.4 is low, < 0.7 medium, otherwise high
+MEDIUM_RISK_THRESHOLD = 0.4
+HIGH_RISK_THRESHOLD = 0.7
+RISK_LEVELS = ["low", "medium", "high"]
+
 
 class DemandForecastRequest(BaseModel):
     restaurant_id: str
@@ -47,8 +132,15 @@ class DemandForecastResponse(BaseModel):
     factors: Dict[str, Any]
 
 
+class Customer(BaseModel):
+    id: Any = None
+    days_since_last_visit: float = 90
+    visit_count: float = 1
+    total_spent: float = 0
+
+
 class ChurnPredictionRequest(BaseModel):
-    customers: List[Dict[str, Any]]
+    customers: List[Customer]
 
 
 class ChurnPredictionResponse(BaseModel):
@@ -66,8 +158,14 @@ class MenuOptimizationResponse(BaseModel):
     insights: Dict[str, Any]
 
 
+class Review(BaseModel):
+    id: Any = None
+    comment: Optional[str] = None
+    text: Optional[str] = None
+
+
 class SentimentAnalysisRequest(BaseModel):
-    reviews: List[Dict[str, Any]]
+    reviews: List[Review]
 
 
 class SentimentAnalysisResponse(BaseModel):
@@ -88,6 +186,292 @@ class StaffOptimizationResponse(BaseModel):
     coverage_analysis: Dict[str, Any]
 
 
+@lru_cache(maxsize=100_000)
+def _cached_scores(text: str):
+    """Memoize VADER scores; duplicate short reviews are common."""
+    return tuple(sentiment_analyzer.polarity_scores(text).items())
+
+
+def _on_aspect_match(aspect_id, start, end, flags, matched):
+    matched.add(aspect_id)
+
+
+def _detect_aspects(text_lower: str) -> List[str]:
+    """Return the aspects mentioned in a lowercased review, in ASPECT_KEYWORDS order."""
+    if aspect_database is None:
+        return [
+            aspect for aspect, pattern in ASPECT_PATTERNS.items()
+            if pattern.search(text_lower)
+        ]
+
+    scratch = getattr(_hyperscan_local, 'scratch', None)
+    if scratch is None:
+        scratch = _hyperscan_local.scratch = hyperscan.Scratch(aspect_database)
+
+    matched = set()
+    aspect_database.scan(
+        text_lower.encode(), match_event_handler=_on_aspect_match, context=matched, scratch=scratch
+    )
+    return [aspect for aspect_id, aspect in enumerate(ASPECT_NAMES) if aspect_id in matched]
+
+
+def _analyze_review_text(text: str):
+    """Score a single review and detect which aspects it mentions."""
+    scores = dict(_cached_scores(text))
+    hit_aspects = _detect_aspects(text.lower())
+    return scores, hit_aspects
+
+
+# Long-lived so each thread's Hyperscan scratch is reused across batches
+_sentiment_executor = ThreadPoolExecutor(thread_name_prefix="sentiment")
+
+
+def _score_reviews_sync(texts: List[str]):
+    """Run VADER scoring and aspect detection for a batch of reviews."""
+    return list(_sentiment_executor.map(_analyze_review_text, texts))
+
+
+@njit(fastmath=True, cache=True, nogil=True)
+def _churn_kernel(recency_days, frequency, monetary, out_factors, out_prob, out_risk):
+    """Compiled RFM churn scoring; writes factors, probability and risk index."""
+    for i in range(recency_days.shape[0]):
+        recency_score = min(recency_days[i] / 180.0, 1.0)  # Higher = more likely to churn
+        frequency_score = max(0.0, 1.0 - frequency[i] / 50.0)  # Lower frequency = higher churn
+        monetary_score = max(0.0, 1.0 - monetary[i] / 2000.0)  # Lower spend = higher churn
+
+        # Weighted churn probability with logistic transformation
+        weighted = recency_score * 0.5 + frequency_score * 0.3 + monetary_score * 0.2
+        prob = 1.0 / (1.0 + math.exp(-4.0 * (weighted - 0.5)))
+
+        out_factors[i, 0] = recency_score
+        out_factors[i, 1] = frequency_score
+        out_factors[i, 2] = monetary_score
+        out_prob[i] = prob
+        # 0 = low, 1 = medium, 2 = high
+        if prob >= HIGH_RISK_THRESHOLD:
+            out_risk[i] = 2
+        elif prob >= MEDIUM_RISK_THRESHOLD:
+            out_risk[i] = 1
+        else:
+            out_risk[i] = 0
+
+
+def _forecast_pool_size() -> int:
+    """Forecast workers per API process; FORECAST_WORKERS overrides the default.
+
+    Every gunicorn worker builds its own pool, so by default the CPUs are
+    split across WEB_CONCURRENCY workers instead of each taking all of them.
+    """
+    if os.getenv("FORECAST_WORKERS"):
+        return max(1, int(os.environ["FORECAST_WORKERS"]))
+    web_workers = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+    return max(1, (os.cpu_count() or 1) // web_workers)
+
+
+def _warm_up_churn_kernel():
+    """Compile the churn kernel up front so the first request doesn't pay for it."""
+    sample = np.ones(1)
+    _churn_kernel(sample, sample, sample, np.empty((1, 3)), np.empty(1), np.empty(1, dtype=np.int64))
+
+
+def _customer_field(customers: List[Customer], name: str) -> np.ndarray:
+    """Collect one numeric customer field into a float64 array."""
+    return np.fromiter(map(attrgetter(name), customers), dtype=np.float64, count=len(customers))
+
+
+def _score_churn_batch(customers: List[Customer]) -> List[Dict[str, Any]]:
+    """Score churn risk for a batch of customers with vectorized RFM math."""
+    n = len(customers)
+
+    # Build RFM arrays once so scoring runs as vectorized NumPy ops
+    recency_days = _customer_field(customers, 'days_since_last_visit')
+    frequency = _customer_field(customers, 'visit_count')
+    monetary = _customer_field(customers, 'total_spent')
+    avg_order_value = np.divide(
+        monetary, frequency, out=np.zeros(n), where=frequency > 0
+    )
+
+    # Fused RFM scoring, logistic transform and risk bucketing
+    factors = np.empty((n, 3))
+    churn_probability = np.empty(n)
+    risk_idx = np.empty(n, dtype=np.int64)
+    _churn_kernel(recency_days, frequency, monetary, factors, churn_probability, risk_idx)
+    recency_score, frequency_score, monetary_score = factors.T
+
+    lifetime_value = avg_order_value * frequency * (1 - churn_probability) * 2
+
+    predictions = []
+    for customer, recency, freq, aov, prob, risk, r_score, f_score, m_score, ltv in zip(
+        customers,
+        recency_days.tolist(),
+        frequency.tolist(),
+        avg_order_value.tolist(),
+        churn_probability.tolist(),
+        risk_idx.tolist(),
+        recency_score.tolist(),
+        frequency_score.tolist(),
+        monetary_score.tolist(),
+        lifetime_value.tolist()
+    ):
+        # Generate retention suggestions
+        suggestions = []
+        if recency > 60:
+            suggestions.append("Send re-engagement email with special offer")
+        if freq < 5:
+            suggestions.append("Enroll in loyalty program")
+        if aov < 40:
+            suggestions.append("Upsell premium items on next visit")
+
+        predictions.append({
+            "customer_id": customer.id,
+            "churn_probability": round(prob, 3),
+            "risk_level": RISK_LEVELS[risk],
+            "factors": {
+                "recency_impact": round(r_score, 3),
+                "frequency_impact": round(f_score, 3),
+                "monetary_impact": round(m_score, 3)
+            },
+            "retention_suggestions": suggestions,
+            "estimated_lifetime_value": round(ltv, 2)
+        })
+
+    return predictions
+
+
+class DynamicBatcher:
+    """Coalesce concurrent requests into a single batched call.
+
+    A request that finds nothing else queued is dispatched right away. Under
+    contention requests are collected until ``max_batch_size`` are waiting or
+    ``max_delay`` seconds have passed, then ``batch_fn`` runs once in a worker
+    thread over the concatenated items and each caller gets its own slice.
+    """
+
+    def __init__(self, batch_fn, max_batch_size: int = 64, max_delay: float = 0.05):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        # Fail requests that were still waiting so their callers don't hang
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher stopped"))
+
+    async def submit(self, items: List[Any]) -> List[Any]:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((items, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = []
+            try:
+                batch.append(await self._queue.get())
+                # Only hold the batch open when other requests are waiting
+                if not self._queue.empty():
+                    deadline = loop.time() + self.max_delay
+                    while len(batch) < self.max_batch_size:
+                        timeout = deadline - loop.time()
+                        if timeout <= 0:
+                            break
+                        try:
+                            batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                        except asyncio.TimeoutError:
+                            break
+
+                await self._process(batch)
+            except asyncio.CancelledError:
+                # Requests taken off the queue are not drained by stop()
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(RuntimeError("Batcher stopped"))
+                raise
+
+    async def _process(self, batch):
+        items = [item for request_items, _ in batch for item in request_items]
+        try:
+            results = await asyncio.to_thread(self.batch_fn, items)
+        except Exception as e:
+            if len(batch) == 1:
+                _, future = batch[0]
+                if not future.done():
+                    future.set_exception(e)
+                return
+            # Retry one by one so a bad payload only fails its own request
+            for entry in batch:
+                await self._process([entry])
+            return
+
+        offset = 0
+        for request_items, future in batch:
+            end = offset + len(request_items)
+            if not future.done():
+                future.set_result(results[offset:end])
+            offset = end
+
+
+churn_batcher = DynamicBatcher(_score_churn_batch)
+sentiment_batcher = DynamicBatcher(_score_reviews_sync)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # forkserver: workers never inherit this process's threads. The pool
+    # spawns a worker per submit() while none is idle, so queue one no-op per
+    # worker to start them all now; each loads Prophet in its initializer
+    max_workers = _forecast_pool_size()
+    app.state.forecast_pool = ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("forkserver"),
+        initializer=forecasting.init_worker
+    )
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(
+        loop.run_in_executor(app.state.forecast_pool, forecasting.ready)
+        for _ in range(max_workers)
+    ))
+    _warm_up_churn_kernel()
+    churn_batcher.start()
+    sentiment_batcher.start()
+    yield
+    await churn_batcher.stop()
+    await sentiment_batcher.stop()
+    app.state.forecast_pool.shutdown()
+
+
+app = FastAPI(
+    title="FlavorMetrics ML Service",
+    description="Machine Learning API for Restaurant Analytics",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+
 @app.get("/health")
 async def health_check():
     return {
@@ -97,6 +481,31 @@ async def health_check():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    sentiment_info = _cached_scores.cache_info()
+    with _forecast_cache_lock:
+        forecast_size = len(_forecast_cache)
+    with _menu_cache_lock:
+        menu_size = len(_menu_cache)
+    return {
+        "sentiment_cache": {
+            "hits": sentiment_info.hits,
+            "misses": sentiment_info.misses,
+            "size": sentiment_info.currsize,
+            "max_size": sentiment_info.maxsize
+        },
+        "forecast_cache": {
+            "size": forecast_size,
+            "max_size": _forecast_cache.maxsize
+        },
+        "menu_cache": {
+            "size": menu_size,
+            "max_size": _menu_cache.maxsize
+        }
+    }
+
+
 @app.post("/api/ml/demand-forecast", response_model=DemandForecastResponse)
 async def forecast_demand(request: DemandForecastRequest):
     """Forecast customer demand using Prophet time series model."""
@@ -109,34 +518,52 @@ async def forecast_demand(request: DemandForecastRequest):
         df['ds'] = pd.to_datetime(df['date'])
         df['y'] = df['covers']  # Number of customers
 
-        # Fit Prophet model
-        model = Prophet(
-            yearly_seasonality=True,
-            weekly_seasonality=True,
-            daily_seasonality=False,
-            changepoint_prior_scale=0.05
-        )
+        # Reuse a previous fit when the same history was already forecast
+        history = df[['ds', 'y']]
+        data_hash = hashlib.blake2b(
+            pd.util.hash_pandas_object(history, index=False).values.tobytes()
+        ).hexdigest()
+        cache_key = (request.restaurant_id, data_hash, request.forecast_days)
+
+        with _forecast_cache_lock:
+            future_forecast = _forecast_cache.get(cache_key)
+
+        if future_forecast is None:
+            # Fit in a worker process so the event loop stays free
+            loop = asyncio.get_running_loop()
+            future_forecast = await loop.run_in_executor(
+                app.state.forecast_pool, forecasting.fit_and_predict, history, request.forecast_days
+            )
 
-        # Add holiday effects if available
-        model.fit(df[['ds', 'y']])
+            with _forecast_cache_lock:
+                _forecast_cache[cache_key] = future_forecast
 
-        # Generate future dates
-        future = model.make_future_dataframe(periods=request.forecast_days)
-        forecast = model.predict(future)
+        # Convert whole columns up front instead of boxing each row
+        ds = future_forecast['ds']
+        weekly = future_forecast['weekly'] if 'weekly' in future_forecast else np.zeros(len(future_forecast))
 
-        # Get forecast for future dates only
-        future_forecast = forecast.tail(request.forecast_days)
+        expected_covers = future_forecast['yhat'].to_numpy().astype(int).clip(min=0)
+        confidence_low = future_forecast['yhat_lower'].to_numpy().astype(int).clip(min=0)
+        confidence_high = future_forecast['yhat_upper'].to_numpy().astype(int)
 
         forecasts = []
-        for _, row in future_forecast.iterrows():
+        for date, day_of_week, expected, low, high, trend, weekly_effect in zip(
+            ds.dt.strftime('%Y-%m-%d'),
+            ds.dt.weekday.tolist(),
+            expected_covers.tolist(),
+            confidence_low.tolist(),
+            confidence_high.tolist(),
+            future_forecast['trend'].tolist(),
+            np.asarray(weekly, dtype=np.float64).tolist()
+        ):
             forecasts.append({
-                "date": row['ds'].strftime('%Y-%m-%d'),
-                "day_of_week": row['ds'].weekday(),
-                "expected_covers": max(0, int(row['yhat'])),
-                "confidence_low": max(0, int(row['yhat_lower'])),
-                "confidence_high": int(row['yhat_upper']),
-                "trend": float(row['trend']),
-                "weekly_effect": float(row['weekly']) if 'weekly' in row else 0
+                "date": date,
+                "day_of_week": day_of_week,
+                "expected_covers": expected,
+                "confidence_low": low,
+                "confidence_high": high,
+                "trend": trend,
+                "weekly_effect": weekly_effect
             })
 
         # Calculate average revenue per cover from historical data
@@ -145,9 +572,9 @@ async def forecast_demand(request: DemandForecastRequest):
         return DemandForecastResponse(
             forecasts=forecasts,
             confidence_intervals={
-                "lower_bound": sum(f['confidence_low'] for f in forecasts),
-                "upper_bound": sum(f['confidence_high'] for f in forecasts),
-                "mean": sum(f['expected_covers'] for f in forecasts)
+                "lower_bound": int(confidence_low.sum()),
+                "upper_bound": int(confidence_high.sum()),
+                "mean": int(expected_covers.sum())
             },
             factors={
                 "weekly_pattern": {
@@ -176,62 +603,11 @@ async def predict_churn(request: ChurnPredictionRequest):
                 risk_summary={"high": 0, "medium": 0, "low": 0}
             )
 
-        predictions = []
-        risk_counts = {"high": 0, "medium": 0, "low": 0}
-
-        for customer in request.customers:
-            # Calculate RFM-based churn probability
-            recency_days = customer.get('days_since_last_visit', 90)
-            frequency = customer.get('visit_count', 1)
-            monetary = customer.get('total_spent', 0)
-            avg_order_value = monetary / frequency if frequency > 0 else 0
-
-            # Simple churn scoring based on RFM
-            recency_score = min(recency_days / 180, 1.0)  # Higher = more likely to churn
-            frequency_score = max(0, 1 - (frequency / 50))  # Lower frequency = higher churn
-            monetary_score = max(0, 1 - (monetary / 2000))  # Lower spend = higher churn
-
-            # Weighted churn probability
-            churn_probability = (
-                recency_score * 0.5 +
-                frequency_score * 0.3 +
-                monetary_score * 0.2
-            )
+        # Coalesce with concurrent requests into one vectorized pass
+        predictions = await churn_batcher.submit(request.customers)
 
-            # Apply logistic transformation
-            churn_probability = 1 / (1 + np.exp(-4 * (churn_probability - 0.5)))
-
-            # Determine risk level
-            if churn_probability >= 0.7:
-                risk_level = "high"
-            elif churn_probability >= 0.4:
-                risk_level = "medium"
-            else:
-                risk_level = "low"
-
-            risk_counts[risk_level] += 1
-
-            # Generate retention suggestions
-            suggestions = []
-            if recency_days > 60:
-                suggestions.append("Send re-engagement email with special offer")
-            if frequency < 5:
-                suggestions.append("Enroll in loyalty program")
-            if avg_order_value < 40:
-                suggestions.append("Upsell premium items on next visit")
-
-            predictions.append({
-                "customer_id": customer.get('id'),
-                "churn_probability": round(churn_probability, 3),
-                "risk_level": risk_level,
-                "factors": {
-                    "recency_impact": round(recency_score, 3),
-                    "frequency_impact": round(frequency_score, 3),
-                    "monetary_impact": round(monetary_score, 3)
-                },
-                "retention_suggestions": suggestions,
-                "estimated_lifetime_value": round(avg_order_value * frequency * (1 - churn_probability) * 2, 2)
-            })
+        risk_levels = [p['risk_level'] for p in predictions]
+        risk_counts = {level: risk_levels.count(level) for level in ("high", "medium", "low")}
 
         return ChurnPredictionResponse(
             predictions=predictions,
@@ -242,7 +618,7 @@ async def predict_churn(request: ChurnPredictionRequest):
 
 
 @app.post("/api/ml/menu-optimization", response_model=MenuOptimizationResponse)
-async def optimize_menu(request: MenuOptimizationRequest):
+async def optimize_menu(request: MenuOptimizationRequest, response: Response):
     """Analyze menu items and provide optimization recommendations."""
     try:
         if not request.menu_items:
@@ -253,94 +629,105 @@ async def optimize_menu(request: MenuOptimizationRequest):
 
         items = request.menu_items
 
-        # Calculate metrics for each item
-        total_orders = sum(item.get('order_count', 0) for item in items)
-        total_profit = sum(
-            (item.get('price', 0) - item.get('cost', 0)) * item.get('order_count', 0)
-            for item in items
-        )
+        # Menus change rarely, so serve repeat polls of the same menu from cache
+        cache_key = hashlib.blake2b(orjson.dumps(items, option=orjson.OPT_SORT_KEYS)).hexdigest()
+        with _menu_cache_lock:
+            cached = _menu_cache.get(cache_key)
+        if cached is not None:
+            response.headers["X-Cache"] = "hit"
+            return cached
+
+        # Load numeric menu fields once and score every item column-wise
+        df = pd.DataFrame(items, columns=['price', 'cost', 'order_count']).fillna(0).astype(np.float64)
+        price = df['price'].to_numpy()
+        cost = df['cost'].to_numpy()
+        order_count = df['order_count'].to_numpy()
+
+        total_orders = order_count.sum()
 
         avg_order_share = 1 / len(items) if items else 0
-        avg_profit_margin = np.mean([
-            (item.get('price', 0) - item.get('cost', 0)) / item.get('price', 1)
-            for item in items if item.get('price', 0) > 0
-        ])
+        has_price = price > 0
+        profit_margin = np.divide(price - cost, price, out=np.zeros(len(items)), where=has_price)
+        avg_profit_margin = np.mean(profit_margin[has_price])
+
+        # Calculate popularity and profitability indices
+        if total_orders > 0:
+            popularity_index = (order_count / total_orders) / avg_order_share
+        else:
+            popularity_index = np.zeros(len(items))
+        if avg_profit_margin > 0:
+            profitability_index = profit_margin / avg_profit_margin
+        else:
+            profitability_index = np.zeros(len(items))
+
+        # Classify items on the menu engineering matrix
+        popular = popularity_index >= 1
+        profitable = profitability_index >= 1
+        classification = np.select(
+            [popular & profitable, popular, profitable],
+            ["Star", "Plowhorse", "Puzzle"],
+            default="Dog"
+        )
+
+        # Calculate optimal price
+        price_elasticity = -1.5  # Assumed elasticity
+        optimal_price = cost / (1 + 1/price_elasticity)
+        suggested_price = np.maximum(optimal_price, cost * 1.3)
+        expected_profit_change = ((suggested_price - cost) - (price - cost)) * order_count
 
         recommendations = []
-        stars = []
-        plowhorses = []
-        puzzles = []
-        dogs = []
-
-        for item in items:
-            order_count = item.get('order_count', 0)
-            price = item.get('price', 0)
-            cost = item.get('cost', 0)
-            profit_margin = (price - cost) / price if price > 0 else 0
-
-            # Calculate popularity and profitability indices
-            popularity_index = (order_count / total_orders) / avg_order_share if total_orders > 0 else 0
-            profitability_index = profit_margin / avg_profit_margin if avg_profit_margin > 0 else 0
-
-            # Classify item
-            if popularity_index >= 1 and profitability_index >= 1:
-                classification = "Star"
-                stars.append(item.get('name'))
-                action = "Maintain position, consider slight price increase"
-            elif popularity_index >= 1 and profitability_index < 1:
-                classification = "Plowhorse"
-                plowhorses.append(item.get('name'))
-                action = "Reduce portion size or increase price to improve margin"
-            elif popularity_index < 1 and profitability_index >= 1:
-                classification = "Puzzle"
-                puzzles.append(item.get('name'))
-                action = "Increase visibility, train staff to suggest"
-            else:
-                classification = "Dog"
-                dogs.append(item.get('name'))
-                action = "Consider removing or complete redesign"
-
-            # Calculate optimal price
-            price_elasticity = -1.5  # Assumed elasticity
-            optimal_price = cost / (1 + 1/price_elasticity)
+        scores = []
+        for item, margin, pop_index, prof_index, item_class, suggested, profit_change in zip(
+            items,
+            profit_margin.tolist(),
+            popularity_index.tolist(),
+            profitability_index.tolist(),
+            classification.tolist(),
+            suggested_price.tolist(),
+            expected_profit_change.tolist()
+        ):
+            pop_index = round(pop_index, 2)
+            prof_index = round(prof_index, 2)
+            scores.append(prof_index * pop_index)
 
             recommendations.append({
                 "item_id": item.get('id'),
                 "item_name": item.get('name'),
-                "current_price": price,
-                "current_cost": cost,
-                "profit_margin": round(profit_margin * 100, 1),
-                "popularity_index": round(popularity_index, 2),
-                "profitability_index": round(profitability_index, 2),
-                "classification": classification,
-                "recommended_action": action,
-                "suggested_price": round(max(optimal_price, cost * 1.3), 2),
-                "expected_profit_change": round(
-                    ((max(optimal_price, cost * 1.3) - cost) - (price - cost)) * order_count,
-                    2
-                )
+                "current_price": item.get('price', 0),
+                "current_cost": item.get('cost', 0),
+                "profit_margin": round(margin * 100, 1),
+                "popularity_index": pop_index,
+                "profitability_index": prof_index,
+                "classification": item_class,
+                "recommended_action": MENU_ACTIONS[item_class],
+                "suggested_price": round(suggested, 2),
+                "expected_profit_change": round(profit_change, 2)
             })
 
-        return MenuOptimizationResponse(
+        names = np.array([item.get('name') for item in items], dtype=object)
+
+        result = MenuOptimizationResponse(
             recommendations=recommendations,
             insights={
                 "total_items": len(items),
-                "stars": stars,
-                "plowhorses": plowhorses,
-                "puzzles": puzzles,
-                "dogs": dogs,
-                "avg_profit_margin": round(avg_profit_margin * 100, 1),
-                "top_performers": sorted(
-                    recommendations,
-                    key=lambda x: x['profitability_index'] * x['popularity_index'],
-                    reverse=True
-                )[:3],
-                "needs_attention": sorted(
-                    recommendations,
-                    key=lambda x: x['profitability_index'] * x['popularity_index']
-                )[:3]
+                "stars": names[classification == "Star"].tolist(),
+                "plowhorses": names[classification == "Plowhorse"].tolist(),
+                "puzzles": names[classification == "Puzzle"].tolist(),
+                "dogs": names[classification == "Dog"].tolist(),
+                "avg_profit_margin": round(float(avg_profit_margin) * 100, 1),
+                "top_performers": [
+                    recommendations[i] for i in heapq.nlargest(3, range(len(scores)), key=scores.__getitem__)
+                ],
+                "needs_attention": [
+                    recommendations[i] for i in heapq.nsmallest(3, range(len(scores)), key=scores.__getitem__)
+                ]
             }
         )
+
+        with _menu_cache_lock:
+            _menu_cache[cache_key] = result
+        response.headers["X-Cache"] = "miss"
+        return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -357,47 +744,37 @@ async def analyze_sentiment(request: SentimentAnalysisRequest):
             )
 
         analyzed = []
-        sentiment_scores = []
-
-        # Common aspect keywords
-        aspects = {
-            "food": ["food", "dish", "meal", "taste", "flavor", "menu", "portion"],
-            "service": ["service", "server", "waiter", "waitress", "staff", "attentive"],
-            "ambiance": ["ambiance", "atmosphere", "decor", "music", "noise", "lighting"],
-            "value": ["price", "value", "worth", "expensive", "cheap", "affordable"],
-            "wait_time": ["wait", "time", "slow", "fast", "quick", "delayed"]
-        }
 
-        aspect_sentiments = {k: [] for k in aspects}
+        aspect_sentiments = {k: [] for k in ASPECT_KEYWORDS}
+
+        texts = [review.comment or review.text or '' for review in request.reviews]
 
-        for review in request.reviews:
-            text = review.get('comment', '') or review.get('text', '')
+        # Score off the event loop, batched with concurrent requests
+        results = await sentiment_batcher.submit(texts)
 
-            # Get sentiment scores
-            scores = sentiment_analyzer.polarity_scores(text)
+        # Label every review in one pass over the compound scores
+        compound_scores = np.array([scores['compound'] for scores, _ in results])
+        labels = np.select(
+            [compound_scores >= 0.05, compound_scores <= -0.05],
+            ["positive", "negative"],
+            default="neutral"
+        )
+        label_values, label_counts = np.unique(labels, return_counts=True)
+        sentiment_counts = dict(zip(label_values.tolist(), label_counts.tolist()))
+
+        for review, text, (scores, hit_aspects), sentiment in zip(
+            request.reviews, texts, results, labels.tolist()
+        ):
             compound = scores['compound']
-            sentiment_scores.append(compound)
-
-            # Determine sentiment label
-            if compound >= 0.05:
-                sentiment = "positive"
-            elif compound <= -0.05:
-                sentiment = "negative"
-            else:
-                sentiment = "neutral"
-
-            # Analyze aspects
-            text_lower = text.lower()
+
             review_aspects = {}
-            for aspect, keywords in aspects.items():
-                if any(kw in text_lower for kw in keywords):
-                    # Extract sentences containing the keyword
-                    aspect_score = compound  # Simplified: use overall sentiment
-                    review_aspects[aspect] = aspect_score
-                    aspect_sentiments[aspect].append(aspect_score)
+            for aspect in hit_aspects:
+                aspect_score = compound  # Simplified: use overall sentiment
+                review_aspects[aspect] = aspect_score
+                aspect_sentiments[aspect].append(aspect_score)
 
             analyzed.append({
-                "review_id": review.get('id'),
+                "review_id": review.id,
                 "text": text[:200] + "..." if len(text) > 200 else text,
                 "sentiment": sentiment,
                 "sentiment_score": round(compound, 3),
@@ -408,7 +785,7 @@ async def analyze_sentiment(request: SentimentAnalysisRequest):
             })
 
         # Calculate overall sentiment
-        avg_sentiment = np.mean(sentiment_scores) if sentiment_scores else 0
+        avg_sentiment = compound_scores.mean()
 
         # Calculate aspect averages
         key_themes = []
@@ -429,9 +806,9 @@ async def analyze_sentiment(request: SentimentAnalysisRequest):
             overall_sentiment={
                 "average_score": round(avg_sentiment, 3),
                 "label": "positive" if avg_sentiment >= 0.05 else "negative" if avg_sentiment <= -0.05 else "neutral",
-                "positive_count": sum(1 for r in analyzed if r['sentiment'] == 'positive'),
-                "negative_count": sum(1 for r in analyzed if r['sentiment'] == 'negative'),
-                "neutral_count": sum(1 for r in analyzed if r['sentiment'] == 'neutral'),
+                "positive_count": sentiment_counts.get("positive", 0),
+                "negative_count": sentiment_counts.get("negative", 0),
+                "neutral_count": sentiment_counts.get("neutral", 0),
                 "total_reviews": len(analyzed)
             },
             key_themes=key_themes
@@ -466,45 +843,27 @@ async def optimize_staffing(request: StaffOptimizationRequest):
 
         expected_covers = int(base_covers * day_multipliers.get(day_of_week, 1.0))
 
-        # Calculate staff needs by hour (11am - 11pm)
-        hourly_distribution = {
-            11: 0.3, 12: 0.8, 13: 1.0, 14: 0.6,  # Lunch
-            15: 0.3, 16: 0.4, 17: 0.7, 18: 1.2,  # Transition
-            19: 1.4, 20: 1.3, 21: 1.0, 22: 0.5   # Dinner
-        }
-
-        # Staff ratios (covers per staff member)
-        staff_ratios = {
-            "SERVER": 15,      # 15 covers per server
-            "KITCHEN": 25,     # 25 covers per kitchen staff
-            "BARTENDER": 30,   # 30 covers per bartender
-            "HOST": 60,        # 1 host per 60 covers
-            "BUSSER": 30       # 30 covers per busser
-        }
+        # Calculate staff needs for every hour and role in one array op
+        hour_covers = (expected_covers * _HOURLY_FACTORS / _HOURLY_SUM * 2).astype(int)
+        staff_needed = np.maximum(
+            1, np.ceil(hour_covers[:, None] / _STAFF_RATIOS[None, :])
+        ).astype(int)
 
         recommended_schedule = []
 
-        for hour, demand_factor in hourly_distribution.items():
-            hour_covers = int(expected_covers * demand_factor / sum(hourly_distribution.values()) * 2)
-
-            hour_needs = {}
-            for role, ratio in staff_ratios.items():
-                needed = max(1, int(np.ceil(hour_covers / ratio)))
-                hour_needs[role] = needed
-
+        for (hour, demand_factor), covers, needs in zip(
+            HOURLY_DISTRIBUTION.items(), hour_covers.tolist(), staff_needed.tolist()
+        ):
             recommended_schedule.append({
                 "hour": hour,
                 "time": f"{hour:02d}:00",
-                "expected_covers": hour_covers,
+                "expected_covers": covers,
                 "demand_level": "high" if demand_factor >= 1.0 else "medium" if demand_factor >= 0.6 else "low",
-                "staff_needed": hour_needs
+                "staff_needed": dict(zip(STAFF_RATIOS, needs))
             })
 
         # Calculate total staff hours needed
-        total_hours = {role: 0 for role in staff_ratios}
-        for hour_data in recommended_schedule:
-            for role, count in hour_data['staff_needed'].items():
-                total_hours[role] += count
+        total_hours = dict(zip(STAFF_RATIOS, staff_needed.sum(axis=0).tolist()))
 
         return StaffOptimizationResponse(
             recommended_schedule=recommended_schedule,